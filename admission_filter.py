@@ -0,0 +1,45 @@
+from typing import Optional
+
+_HALVE = bytes(i >> 1 for i in range(256))  # bytearray.translate table that halves every cell
+_GOLDEN = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+
+class AdmissionFilter:
+    """TinyLFU-style doorkeeper: a small counting Bloom filter of recently offered keys.
+
+    A key is admitted only once it has been seen before, so a one-off scan cannot push out the working set.
+    Cells are 8-bit saturating counters and are halved every ``sample_size`` increments so old keys fade out.
+    """
+
+    __slots__ = ('cells', 'sample_size', 'additions')
+
+    def __init__(self, size: int = 1024, sample_size: Optional[int] = None):
+        if size <= 0 or size & (size - 1):
+            raise ValueError("Admission filter size must be a positive power of two")
+        self.cells = bytearray(size)
+        # With four cells per key, about size // 8 keys keep the false-admission rate near 2%
+        self.sample_size = sample_size if sample_size is not None else max(1, size // 8)
+        self.additions = 0
+
+    def _positions(self, key) -> tuple:
+        # Fibonacci hashing spreads hash(key) over 64 bits; the high bits give four independent cell indexes.
+        # The low bits of hash(key) are left alone since they already pick the segment.
+        x = (hash(key) * _GOLDEN) & _MASK64
+        mask = len(self.cells) - 1
+        return ((x >> 24) & mask, (x >> 34) & mask, (x >> 44) & mask, (x >> 54) & mask)
+
+    def admit(self, key) -> bool:
+        # True if key was offered before; otherwise record it and reject
+        cells = self.cells
+        positions = self._positions(key)
+        if all(cells[p] for p in positions):
+            return True
+
+        for p in positions:
+            if cells[p] < 255:
+                cells[p] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.cells = cells.translate(_HALVE)
+            self.additions = 0
+        return False
@@ -1,18 +1,38 @@
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar, Optional, Dict, Any
-from threading import Lock
-from time import time
+from typing import Generic, TypeVar, Optional, Dict, Any, Iterable, List, Tuple
+import heapq
+from collections import deque
+from concurrent.futures import Future
+from itertools import count
+from queue import SimpleQueue
+from threading import Lock, Thread
+from time import monotonic
 from eviction_policies import EvictionPolicy
+from admission_filter import AdmissionFilter
+from rwlock import RWLock
 from cache_metrics import CacheMetrics
 
 K = TypeVar('K')
 V = TypeVar('V')
 
+_MISSING = object()  # Lookup sentinel, distinct from any value a caller could store
+_TOUCH_BUFFER_SIZE = 64  # Buffered hits per segment before get drains them; older hits are dropped past this
+
+def _next_power_of_two(n: int) -> int:
+    return 1 << (n - 1).bit_length()
+
 class CacheItem:
+    __slots__ = ('value', 'expiry')  # No per-instance __dict__
+
     def __init__(self, value: Any, expiry: Optional[float] = None):
         self.value = value
         self.expiry = expiry
 
+    def reset(self, value: Any, expiry: Optional[float] = None) -> 'CacheItem':
+        self.value = value
+        self.expiry = expiry
+        return self
+
 class Cache(ABC, Generic[K, V]):
     @abstractmethod
     def put(self, key: K, value: V, ttl: Optional[int] = None) -> None:
@@ -30,104 +50,408 @@ class Cache(ABC, Generic[K, V]):
     def get_metrics(self) -> Dict[str, Any]:
         pass
 
+    def get_many(self, keys: Iterable[K], default: Optional[V] = None) -> List[Optional[V]]:
+        # Values in the order of keys, with default for keys that are missing or expired
+        results = []
+        for key in keys:
+            try:
+                results.append(self.get(key))
+            except KeyError:
+                results.append(default)
+        return results
+
+    def put_many(self, items: Iterable[Tuple[K, V]], ttl: Optional[int] = None) -> None:
+        for key, value in items:
+            self.put(key, value, ttl)
+
+class Segment:
+    # Everything one operation needs lives on a single object: one list index per call instead of one per field.
+    __slots__ = ('data', 'lock', 'policy', 'expiry_heap', 'item_pool', 'touch_buffer', 'metrics', 'doorkeeper')
+
+    def __init__(self, policy: EvictionPolicy, metrics: CacheMetrics, doorkeeper: Optional[AdmissionFilter] = None):
+        self.data = {}  # key -> CacheItem
+        self.lock = RWLock()
+        self.policy = policy
+        self.expiry_heap = []  # (expiry, seq, key) min-heap
+        self.item_pool = []  # Free CacheItem shells reused by put
+        # Keys hit under the read lock, not yet touched; None when the policy ignores hits
+        self.touch_buffer = deque(maxlen=_TOUCH_BUFFER_SIZE) if policy.tracks_hits else None
+        self.metrics = metrics
+        self.doorkeeper = doorkeeper  # Consulted before a new key may evict an existing one; None admits everything
+
 class SegmentedCache(Cache[K, V]):
-    def __init__(self, capacity_per_segment: int, eviction_policy_class: EvictionPolicy[K], num_segments: int = 16):
+    def __init__(self, capacity_per_segment: int, eviction_policy_class: EvictionPolicy[K], num_segments: int = 16,
+                 admission_filter: bool = False):
+        if num_segments <= 0:
+            raise ValueError("Number of segments must be positive")
+        num_segments = _next_power_of_two(num_segments)  # Lets _get_segment mask instead of using modulo
         self.capacity_per_segment = capacity_per_segment
         self.eviction_policy_class = eviction_policy_class
-        self.segments = [{} for _ in range(num_segments)]  # Each segment is a dictionary
-        self.eviction_policies = [eviction_policy_class() for _ in range(num_segments)]  # Instantiate policy for each segment
-        self.locks = [Lock() for _ in range(num_segments)]  # One lock per segment
-        self.metrics = CacheMetrics()
-        self.num_segments = num_segments
+        self.admission_filter = admission_filter
+        self.metrics = [CacheMetrics() for _ in range(num_segments)]  # Per segment so threads on different segments never share counters
+        # (segments, mask) is replaced in one assignment by a resize, so a reader never pairs a list with the wrong mask.
+        # Operations lock their segment and then check the layout is still current, retrying if a resize won the race.
+        self._layout = ([self._new_segment(i) for i in range(num_segments)], num_segments - 1)
+        self._expiry_seq = count()  # Tie-breaker so keys are never compared in the heap
         self.global_lock = Lock()
 
+    @property
+    def segments(self) -> List[Segment]:
+        return self._layout[0]
+
+    @property
+    def num_segments(self) -> int:
+        return len(self._layout[0])
+
+    def _new_segment(self, segment_index: int) -> Segment:
+        doorkeeper = AdmissionFilter() if self.admission_filter else None
+        return Segment(self.eviction_policy_class(), self.metrics[segment_index], doorkeeper)
+
     def _get_segment(self, key: K) -> int:
-        return hash(key) % self.num_segments
+        # Segment index for key under the current layout; hot paths inline hash(key) & mask instead
+        return hash(key) & self._layout[1]
 
     def put(self, key: K, value: V, ttl: Optional[int] = None) -> None:
-        segment_index = self._get_segment(key)
-        with self.locks[segment_index]:
-            self._remove_expired_items(segment_index)
-            if key in self.segments[segment_index]:
-                self.eviction_policies[segment_index].remove(key)
-            elif len(self.segments[segment_index]) >= self.capacity_per_segment:
-                self._evict_item(segment_index)
-            
-            expiry = time() + ttl if ttl is not None else None
-            self.segments[segment_index][key] = CacheItem(value, expiry)
-            self.eviction_policies[segment_index].add(key)
+        while True:
+            layout = self._layout
+            seg = layout[0][hash(key) & layout[1]]  # Inlined _get_segment: saves a method call per operation
+            with seg.lock.write:
+                if self._layout is not layout:
+                    continue
+                self._drain_touches(seg)
+                now = monotonic()
+                self._remove_expired_items(seg, now)
+                self._store(seg, key, value, now + ttl if ttl is not None else None)
+                return
+
+    def put_many(self, items: Iterable[Tuple[K, V]], ttl: Optional[int] = None) -> None:
+        # Items are bucketed by segment so each segment's write lock is taken once for the whole batch.
+        # Buckets not yet written when a resize lands are re-bucketed against the new layout.
+        pending = list(items)
+        while pending:
+            layout = self._layout
+            segments, mask = layout
+            buckets = [[] for _ in range(len(segments))]
+            for key, value in pending:
+                buckets[hash(key) & mask].append((key, value))
+
+            pending = []
+            for seg, bucket in zip(segments, buckets):
+                if not bucket:
+                    continue
+                with seg.lock.write:
+                    if self._layout is not layout:
+                        pending.extend(bucket)
+                        continue
+                    self._drain_touches(seg)
+                    now = monotonic()
+                    self._remove_expired_items(seg, now)
+                    expiry = now + ttl if ttl is not None else None
+                    for key, value in bucket:
+                        self._store(seg, key, value, expiry)
+
+    def _store(self, seg: Segment, key: K, value: V, expiry: Optional[float]) -> None:
+        # Caller holds the segment's write lock
+        data = seg.data
+        item = data.get(key, _MISSING)
+        if item is not _MISSING:
+            seg.policy.remove(key)
+            item.reset(value, expiry)
+        else:
+            if len(data) >= self.capacity_per_segment:
+                # A full segment only makes room for keys the doorkeeper has seen before (scan resistance)
+                if seg.doorkeeper is not None and not seg.doorkeeper.admit(key):
+                    seg.metrics.record_rejection()
+                    return
+                self._evict_item(seg)
+            pool = seg.item_pool
+            data[key] = pool.pop().reset(value, expiry) if pool else CacheItem(value, expiry)
+        if expiry is not None:
+            heap = seg.expiry_heap
+            heapq.heappush(heap, (expiry, next(self._expiry_seq), key))
+            if len(heap) > 2 * max(len(data), 1):
+                self._rebuild_expiry_heap(seg)
+        seg.policy.add(key)
+
+    def _rebuild_expiry_heap(self, seg: Segment) -> None:
+        # Overwrites leave stale heap entries behind until their old expiry passes. Rebuilding from the live entries
+        # once stale ones outnumber them keeps the heap within 2x the segment size at amortised O(1) per put.
+        heap = [(item.expiry, next(self._expiry_seq), key) for key, item in seg.data.items() if item.expiry is not None]
+        heapq.heapify(heap)
+        seg.expiry_heap = heap
 
     def get(self, key: K) -> V:
-        segment_index = self._get_segment(key)
-        with self.locks[segment_index]:
-            self._remove_expired_items(segment_index)
-            if key not in self.segments[segment_index]:
-                self.metrics.record_miss()
-                raise KeyError(f"Key '{key}' not found in cache")
-            
-            item = self.segments[segment_index][key]
-            if item.expiry is not None and item.expiry <= time():
-                del self.segments[segment_index][key]
-                self.eviction_policies[segment_index].remove(key)
-                self.metrics.record_expiration()
-                self.metrics.record_miss()
+        while True:
+            layout = self._layout
+            seg = layout[0][hash(key) & layout[1]]
+            metrics = seg.metrics
+            with seg.lock.read:
+                if self._layout is not layout:
+                    continue
+                try:
+                    item = seg.data[key]  # Hits are the common case; a try block costs nothing when no exception is raised
+                except KeyError:
+                    metrics.record_miss()
+                    raise KeyError(f"Key '{key}' not found in cache") from None
+                
+                value = item.value  # Read now: the item may be recycled once the read lock is released
+                expired = item.expiry is not None and item.expiry <= monotonic()
+                if not expired:
+                    # Hits are only recorded here; the policy is updated later under the write lock.
+                    # deque.append is atomic, so concurrent readers can share the buffer.
+                    metrics.record_hit()
+                    buffer = seg.touch_buffer
+                    if buffer is None:
+                        return value
+                    buffer.append(key)
+                    if len(buffer) < _TOUCH_BUFFER_SIZE:
+                        return value
+
+            with seg.lock.write:
+                if self._layout is not layout:
+                    # A resize has rebuilt the segment; a hit is already served, an expired key is looked up again
+                    if not expired:
+                        return value
+                    continue
+                if not expired:
+                    self._drain_touches(seg)
+                    return value
+
+                self._expire_key(seg, key, monotonic())
+                metrics.record_miss()
                 raise KeyError(f"Key '{key}' has expired")
-            
-            self.eviction_policies[segment_index].remove(key)
-            self.eviction_policies[segment_index].add(key)
-            self.metrics.record_hit()
-            return item.value
+
+    def get_many(self, keys: Iterable[K], default: Optional[V] = None) -> List[Optional[V]]:
+        # Keys are bucketed by segment so each segment's read lock is taken once for the whole batch;
+        # the write lock is only taken for segments with expired keys or a full touch buffer.
+        # Buckets not yet read when a resize lands are re-bucketed against the new layout.
+        keys = list(keys)
+        results = [default] * len(keys)
+        pending = list(range(len(keys)))
+        while pending:
+            layout = self._layout
+            segments, mask = layout
+            buckets = [[] for _ in range(len(segments))]
+            for position in pending:
+                buckets[hash(keys[position]) & mask].append(position)
+
+            pending = []
+            for seg, bucket in zip(segments, buckets):
+                if not bucket:
+                    continue
+                data = seg.data
+                buffer = seg.touch_buffer
+                metrics = seg.metrics
+                expired_keys = []
+                with seg.lock.read:
+                    if self._layout is not layout:
+                        pending.extend(bucket)
+                        continue
+                    now = monotonic()
+                    for position in bucket:
+                        key = keys[position]
+                        item = data.get(key, _MISSING)
+                        if item is _MISSING:
+                            metrics.record_miss()
+                            continue
+                        if item.expiry is not None and item.expiry <= now:
+                            expired_keys.append(key)
+                            metrics.record_miss()
+                        else:
+                            results[position] = item.value
+                            if buffer is not None:
+                                buffer.append(key)
+                            metrics.record_hit()
+
+                if expired_keys or (buffer is not None and len(buffer) >= _TOUCH_BUFFER_SIZE):
+                    with seg.lock.write:
+                        if self._layout is not layout:
+                            continue  # Results are already read; expired keys are left for lazy expiry
+                        self._drain_touches(seg)
+                        now = monotonic()
+                        for key in expired_keys:
+                            self._expire_key(seg, key, now)
+        return results
 
     def remove(self, key: K) -> None:
-        segment_index = self._get_segment(key)
-        with self.locks[segment_index]:
-            if key in self.segments[segment_index]:
-                del self.segments[segment_index][key]
-                self.eviction_policies[segment_index].remove(key)
-
-    def _remove_expired_items(self, segment_index: int) -> None:
-        current_time = time()
-        expired_keys = [k for k, v in self.segments[segment_index].items() if v.expiry is not None and v.expiry <= current_time]
-        for key in expired_keys:
-            del self.segments[segment_index][key]
-            self.eviction_policies[segment_index].remove(key)
-            self.metrics.record_expiration()
-
-    def _evict_item(self, segment_index: int) -> None:
-        evicted_key = self.eviction_policies[segment_index].evict()
-        del self.segments[segment_index][evicted_key]
-        self.metrics.record_eviction()
+        while True:
+            layout = self._layout
+            seg = layout[0][hash(key) & layout[1]]
+            with seg.lock.write:
+                if self._layout is not layout:
+                    continue
+                item = seg.data.pop(key, _MISSING)
+                if item is not _MISSING:
+                    self._release_item(seg, item)
+                    seg.policy.remove(key)
+                return
+
+    def _drain_touches(self, seg: Segment) -> None:
+        # Caller holds the segment's write lock. Keys removed since their hit are skipped.
+        buffer = seg.touch_buffer
+        data = seg.data
+        policy = seg.policy
+        while buffer:
+            key = buffer.popleft()
+            if key in data:
+                policy.touch(key)
+
+    def _expire_key(self, seg: Segment, key: K, now: float) -> None:
+        # Caller holds the segment's write lock. The key may have been rewritten since it was seen expired.
+        item = seg.data.get(key)
+        if item is not None and item.expiry is not None and item.expiry <= now:
+            self._release_item(seg, seg.data.pop(key))
+            seg.policy.remove(key)
+            seg.metrics.record_expiration()
+
+    def _remove_expired_items(self, seg: Segment, now: float) -> None:
+        # Only the heap head is inspected, so the work done is proportional to the number of expired entries.
+        # Entries whose key was since overwritten or removed no longer match the stored expiry and are dropped.
+        heap = seg.expiry_heap
+        data = seg.data
+        while heap and heap[0][0] <= now:
+            expiry, _, key = heapq.heappop(heap)
+            item = data.get(key)
+            if item is not None and item.expiry == expiry:
+                self._release_item(seg, data.pop(key))
+                seg.policy.remove(key)
+                seg.metrics.record_expiration()
+
+    def _evict_item(self, seg: Segment) -> None:
+        evicted_key = seg.policy.evict()
+        self._release_item(seg, seg.data.pop(evicted_key))
+        seg.metrics.record_eviction()
+
+    def _release_item(self, seg: Segment, item: CacheItem) -> None:
+        # Keep the shell for the next put; the pool is bounded so a burst of removals cannot pin memory
+        item.value = None
+        pool = seg.item_pool
+        if len(pool) < self.capacity_per_segment:
+            pool.append(item)
 
     def get_metrics(self) -> Dict[str, Any]:
-        return self.metrics.get_metrics()
+        return CacheMetrics.combine(self.metrics)
 
     def resize_segments(self, new_num_segments: int) -> None:
         if new_num_segments <= 0:
             raise ValueError("Number of segments must be positive")
+        new_num_segments = _next_power_of_two(new_num_segments)
         
         acquired_locks = []
         with self.global_lock:
-            current_num_segments = self.num_segments
-            for lock in self.locks:
-                lock.acquire()
-                acquired_locks.append(lock)
+            current_segments = self.segments
+            for seg in current_segments:
+                seg.lock.acquire_write()
+                acquired_locks.append(seg.lock)
 
             try:
-                if new_num_segments > current_num_segments:
-                    self.segments.extend([{} for _ in range(new_num_segments - current_num_segments)])
-                    self.eviction_policies.extend([self.eviction_policy_class() for _ in range(new_num_segments - current_num_segments)])
-                    self.locks.extend([Lock() for _ in range(new_num_segments - current_num_segments)])
-                elif new_num_segments < current_num_segments:
-                    self.segments = self.segments[:new_num_segments]
-                    self.eviction_policies = self.eviction_policies[:new_num_segments]
-                    self.locks = self.locks[:new_num_segments]
-
-                self.num_segments = new_num_segments
+                if new_num_segments != len(current_segments):
+                    self._rehash(new_num_segments)
                 print(f"Segments resized to {new_num_segments}")
 
             finally:
                 for lock in acquired_locks:
-                    lock.release()
+                    lock.release_write()
+
+    def _rehash(self, new_num_segments: int) -> None:
+        # Caller holds every segment lock. Surviving Segment objects (and their locks) are reset in place;
+        # keys keep their CacheItem and are re-added to fresh policies in segment insertion order,
+        # so recency and frequency history is reset by a resize.
+        old_segments = self.segments
+        old_data = [seg.data for seg in old_segments]
+        self.metrics.extend([CacheMetrics() for _ in range(max(0, new_num_segments - len(self.metrics)))])
+        new_segments = old_segments[:new_num_segments]
+        new_segments.extend(self._new_segment(i) for i in range(len(new_segments), new_num_segments))
+        for seg in new_segments:
+            seg.data = {}
+            seg.policy = self.eviction_policy_class()
+            seg.expiry_heap = []
+            seg.item_pool = []
+            seg.touch_buffer = deque(maxlen=_TOUCH_BUFFER_SIZE) if seg.policy.tracks_hits else None
+
+        new_mask = new_num_segments - 1
+        for data in old_data:
+            for key, item in data.items():
+                seg = new_segments[hash(key) & new_mask]
+                seg.data[key] = item
+                seg.policy.add(key)
+                if item.expiry is not None:
+                    seg.expiry_heap.append((item.expiry, next(self._expiry_seq), key))
+
+        for seg in new_segments:
+            heapq.heapify(seg.expiry_heap)
+            while len(seg.data) > self.capacity_per_segment:
+                del seg.data[seg.policy.evict()]
+                seg.metrics.record_eviction()
+
+        # Published last: threads waiting on an old segment's lock see a new layout and retry
+        self._layout = (new_segments, new_mask)
 
     def __str__(self) -> str:
         return f"SegmentedCache with {self.num_segments} segments, capacity per segment: {self.capacity_per_segment}"
+
+class SerializedSegmentedCache(SegmentedCache[K, V]):
+    """SegmentedCache whose put, get and remove run on one worker thread per segment.
+
+    Call close(), or leave a ``with`` block, to stop the workers; put, get and remove raise RuntimeError afterwards.
+    """
+
+    def __init__(self, capacity_per_segment: int, eviction_policy_class: EvictionPolicy[K], num_segments: int = 16,
+                 admission_filter: bool = False):
+        super().__init__(capacity_per_segment, eviction_policy_class, num_segments, admission_filter)
+        # The worker count is fixed at construction; _submit folds it with the current segment mask
+        self._queues = [SimpleQueue() for _ in range(self.num_segments)]
+        self._queue_mask = self.num_segments - 1
+        self._closed = False
+        self._workers = [Thread(target=self._run, args=(queue,), daemon=True) for queue in self._queues]
+        for worker in self._workers:
+            worker.start()
+
+    @staticmethod
+    def _run(queue: SimpleQueue) -> None:
+        while True:
+            op, args, future = queue.get()
+            if op is None:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(op(*args))
+            except BaseException as exc:
+                future.set_exception(exc)
+
+    def _submit(self, key: K, op, *args) -> Any:
+        if self._closed:
+            raise RuntimeError("Cache is closed")
+        future = Future()
+        self._queues[hash(key) & self._queue_mask & self._layout[1]].put((op, args, future))
+        # close() sets the flag before stopping the workers: if it raced with the put above and no worker
+        # picked the request up, cancel it rather than wait on a queue nobody reads
+        if self._closed and future.cancel():
+            raise RuntimeError("Cache is closed")
+        return future.result()
+
+    def put(self, key: K, value: V, ttl: Optional[int] = None) -> None:
+        self._submit(key, SegmentedCache.put, self, key, value, ttl)
+
+    def get(self, key: K) -> V:
+        return self._submit(key, SegmentedCache.get, self, key)
+
+    def remove(self, key: K) -> None:
+        self._submit(key, SegmentedCache.remove, self, key)
+
+    def close(self) -> None:
+        with self.global_lock:
+            if self._closed:
+                return
+            self._closed = True
+            for queue in self._queues:
+                queue.put((None, None, None))
+            for worker in self._workers:
+                worker.join()
+
+    def __enter__(self) -> 'SerializedSegmentedCache[K, V]':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
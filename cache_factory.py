@@ -1,5 +1,5 @@
 from typing import Type
-from cache import SegmentedCache
+from cache import SegmentedCache, SerializedSegmentedCache
 from eviction_policies import EvictionPolicy, FIFOEvictionPolicy, LRUEvictionPolicy, LIFOEvictionPolicy
 
 class CacheFactory:
@@ -14,8 +14,11 @@ class CacheFactory:
         cls._cache_types[cache_type] = policy_class
 
     @classmethod
-    def create_cache(cls, cache_type: str, capacity: int, num_segments: int = 16):
+    def create_cache(cls, cache_type: str, capacity: int, num_segments: int = 16, admission_filter: bool = False,
+                     serialized: bool = False):
         policy_class = cls._cache_types.get(cache_type)
         if policy_class is None:
             raise ValueError(f"Unsupported cache type: {cache_type}")
-        return SegmentedCache(capacity, policy_class, num_segments)
\ No newline at end of file
+        # serialized=True hands each segment to its own worker thread; the caller must close() the cache
+        cache_class = SerializedSegmentedCache if serialized else SegmentedCache
+        return cache_class(capacity, policy_class, num_segments, admission_filter)
\ No newline at end of file
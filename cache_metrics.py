@@ -1,40 +1,57 @@
-from threading import Lock
+from itertools import count
+from typing import Any, Dict, Iterable
+
+# next() on an itertools.count is a single C call and is atomic under the GIL,
+# so the counters below can be bumped from any segment without a shared lock.
+def _peek(counter: count) -> int:
+    # count has no public accessor for its current value; its repr is "count(n)"
+    return int(repr(counter)[6:-1])
 
 class CacheMetrics:
+    __slots__ = ('_hits', '_misses', '_evictions', '_expirations', '_rejections')
+
     def __init__(self):
-        self.hits = 0
-        self.misses = 0
-        self.total_requests = 0
-        self.evictions = 0
-        self.expirations = 0
-        self.lock = Lock()
+        self._hits = count()
+        self._misses = count()
+        self._evictions = count()
+        self._expirations = count()
+        self._rejections = count()
 
     def record_hit(self):
-        with self.lock:
-            self.hits += 1
-            self.total_requests += 1
+        next(self._hits)
 
     def record_miss(self):
-        with self.lock:
-            self.misses += 1
-            self.total_requests += 1
+        next(self._misses)
 
     def record_eviction(self):
-        with self.lock:
-            self.evictions += 1
+        next(self._evictions)
 
     def record_expiration(self):
-        with self.lock:
-            self.expirations += 1
+        next(self._expirations)
+
+    def record_rejection(self):
+        next(self._rejections)
 
     def get_metrics(self):
-        with self.lock:
-            return {
-                "hits": self.hits,
-                "misses": self.misses,
-                "total_requests": self.total_requests,
-                "evictions": self.evictions,
-                "expirations": self.expirations,
-                "hit_ratio": self.hits / self.total_requests if self.total_requests > 0 else 0,
-                "miss_ratio": self.misses / self.total_requests if self.total_requests > 0 else 0
-            }
\ No newline at end of file
+        return CacheMetrics.combine([self])
+
+    @staticmethod
+    def combine(metrics: Iterable['CacheMetrics']) -> Dict[str, Any]:
+        hits = misses = evictions = expirations = rejections = 0
+        for m in metrics:
+            hits += _peek(m._hits)
+            misses += _peek(m._misses)
+            evictions += _peek(m._evictions)
+            expirations += _peek(m._expirations)
+            rejections += _peek(m._rejections)
+        total_requests = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "total_requests": total_requests,
+            "evictions": evictions,
+            "expirations": expirations,
+            "rejections": rejections,
+            "hit_ratio": hits / total_requests if total_requests > 0 else 0,
+            "miss_ratio": misses / total_requests if total_requests > 0 else 0
+        }
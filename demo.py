@@ -2,53 +2,98 @@ import threading
 import time
 from cache_factory import CacheFactory
 from eviction_policies import EvictionPolicy
-from typing import Generic, TypeVar, Dict
-from collections import defaultdict
+from typing import Generic, TypeVar, Dict, Optional
+from collections import OrderedDict
 
 K = TypeVar('K')
 
+# one node per distinct frequency, kept in a doubly linked list sorted by ascending frequency
+class FreqNode(Generic[K]):
+    __slots__ = ('freq', 'keys', 'prev', 'next')
+
+    def __init__(self, freq: int):
+        self.freq = freq
+        self.keys: OrderedDict = OrderedDict()  # insertion order breaks ties in LRU order
+        self.prev: Optional['FreqNode[K]'] = None
+        self.next: Optional['FreqNode[K]'] = None
+
 #  declared this class to implement LFU (least frequently used ) eviction policy
 class LFUEvictionPolicy(EvictionPolicy, Generic[K]):
     def __init__(self):
-        self.key_frequency: Dict[K, int] = defaultdict(int)
-        self.frequency_keys: Dict[int, set[K]] = defaultdict(set)
-        self.min_frequency = 0
+        self.key_node: Dict[K, FreqNode[K]] = {}
+        self.head: Optional[FreqNode[K]] = None  # node with the lowest frequency
+
+    @property
+    def min_frequency(self) -> int:
+        return self.head.freq if self.head is not None else 0
 
     def add(self, key: K) -> None:
-        if key not in self.key_frequency:
-            self.key_frequency[key] = 1
-            self.frequency_keys[1].add(key)
-            self.min_frequency = 1
-        else:
-            self._increment_frequency(key)
+        node = self.key_node.get(key)
+        if node is not None:
+            self._promote(key, node)
+            return
+
+        node = self.head
+        if node is None or node.freq != 1:
+            node = self._insert_after(None, 1)
+        node.keys[key] = None
+        self.key_node[key] = node
 
     def remove(self, key: K) -> None:
-        if key in self.key_frequency:
-            freq = self.key_frequency[key]
-            self.frequency_keys[freq].remove(key)
-            if len(self.frequency_keys[freq]) == 0:
-                del self.frequency_keys[freq]
-                if freq == self.min_frequency:
-                    self.min_frequency += 1
-            del self.key_frequency[key]
+        node = self.key_node.pop(key, None)
+        if node is not None:
+            del node.keys[key]
+            if not node.keys:
+                self._unlink(node)
 
     def evict(self) -> K:
-        if not self.key_frequency:
+        if self.head is None:
             raise ValueError("No keys to evict")
         
-        key_to_evict = next(iter(self.frequency_keys[self.min_frequency]))
-        self.remove(key_to_evict)
+        node = self.head
+        key_to_evict = node.keys.popitem(last=False)[0]
+        del self.key_node[key_to_evict]
+        if not node.keys:
+            self._unlink(node)
         return key_to_evict
 
+    def touch(self, key: K) -> None:
+        self._increment_frequency(key)
+
     def _increment_frequency(self, key: K) -> None:
-        freq = self.key_frequency[key]
-        self.key_frequency[key] = freq + 1
-        self.frequency_keys[freq].remove(key)
-        if len(self.frequency_keys[freq]) == 0:
-            del self.frequency_keys[freq]
-            if freq == self.min_frequency:
-                self.min_frequency += 1
-        self.frequency_keys[freq + 1].add(key)
+        self._promote(key, self.key_node[key])
+
+    def _promote(self, key: K, node: FreqNode[K]) -> None:
+        # Move key from node to the bucket for the next frequency, creating that bucket if needed
+        next_node = node.next
+        if next_node is None or next_node.freq != node.freq + 1:
+            next_node = self._insert_after(node, node.freq + 1)
+        del node.keys[key]
+        next_node.keys[key] = None
+        self.key_node[key] = next_node
+        if not node.keys:
+            self._unlink(node)
+
+    def _insert_after(self, prev: Optional[FreqNode[K]], freq: int) -> FreqNode[K]:
+        node = FreqNode(freq)
+        if prev is None:
+            node.next = self.head
+            self.head = node
+        else:
+            node.prev = prev
+            node.next = prev.next
+            prev.next = node
+        if node.next is not None:
+            node.next.prev = node
+        return node
+
+    def _unlink(self, node: FreqNode[K]) -> None:
+        if node.prev is None:
+            self.head = node.next
+        else:
+            node.prev.next = node.next
+        if node.next is not None:
+            node.next.prev = node.prev
 
 
 
@@ -5,6 +5,8 @@ from collections import OrderedDict
 K = TypeVar('K')
 
 class EvictionPolicy(ABC, Generic[K]):
+    tracks_hits = True  # False when touch() ignores hits, so segments skip buffering them
+
     @abstractmethod
     def add(self, key: K) -> None:
         pass
@@ -17,18 +19,28 @@ class EvictionPolicy(ABC, Generic[K]):
     def evict(self) -> K:
         pass
 
+    def touch(self, key: K) -> None:
+        # Called for cache hits, batched under the segment's write lock; policies that reorder on access override this
+        self.remove(key)
+        self.add(key)
+
 class FIFOEvictionPolicy(EvictionPolicy[K]):
+    tracks_hits = False
+
     def __init__(self):
-        self.queue = []
+        self.order = OrderedDict()
 
     def add(self, key: K) -> None:
-        self.queue.append(key)
+        self.order[key] = None
 
     def remove(self, key: K) -> None:
-        self.queue.remove(key)
+        self.order.pop(key, None)
+
+    def touch(self, key: K) -> None:
+        pass
 
     def evict(self) -> K:
-        return self.queue.pop(0)
+        return self.order.popitem(last=False)[0]
 
 class LRUEvictionPolicy(EvictionPolicy[K]):
     def __init__(self):
@@ -41,18 +53,26 @@ class LRUEvictionPolicy(EvictionPolicy[K]):
         if key in self.order:
             del self.order[key]
 
+    def touch(self, key: K) -> None:
+        self.order.move_to_end(key)
+
     def evict(self) -> K:
         return self.order.popitem(last=False)[0]
 
 class LIFOEvictionPolicy(EvictionPolicy[K]):
+    tracks_hits = False
+
     def __init__(self):
-        self.stack = []
+        self.order = OrderedDict()
 
     def add(self, key: K) -> None:
-        self.stack.append(key)
+        self.order[key] = None
 
     def remove(self, key: K) -> None:
-        self.stack.remove(key)
+        self.order.pop(key, None)
+
+    def touch(self, key: K) -> None:
+        pass
 
     def evict(self) -> K:
-        return self.stack.pop()
\ No newline at end of file
+        return self.order.popitem(last=True)[0]
\ No newline at end of file
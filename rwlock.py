@@ -0,0 +1,70 @@
+from threading import Condition, Lock
+
+class _ReadSide:
+    __slots__ = ('_rwlock',)
+
+    def __init__(self, rwlock: 'RWLock'):
+        self._rwlock = rwlock
+
+    def __enter__(self):
+        self._rwlock.acquire_read()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._rwlock.release_read()
+
+class _WriteSide:
+    __slots__ = ('_rwlock',)
+
+    def __init__(self, rwlock: 'RWLock'):
+        self._rwlock = rwlock
+
+    def __enter__(self):
+        self._rwlock.acquire_write()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._rwlock.release_write()
+
+class RWLock:
+    """Reader-writer lock: any number of readers or a single writer.
+
+    Waiting writers block new readers so a steady stream of reads cannot starve a write.
+    Use ``with lock.read:`` for shared access and ``with lock.write:`` for exclusive access.
+    """
+
+    # Counters live in slots rather than a per-instance __dict__, keeping each segment's lock state compact
+    __slots__ = ('_cond', '_readers', '_writer', '_waiting_writers', 'read', 'write')
+
+    def __init__(self):
+        self._cond = Condition(Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+        self.read = _ReadSide(self)
+        self.write = _WriteSide(self)
+
+    def acquire_read(self) -> None:
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self) -> None:
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
@@ -0,0 +1,139 @@
+import threading
+import unittest
+from cache import SerializedSegmentedCache
+from cache_factory import CacheFactory
+from demo import LFUEvictionPolicy
+
+class ResizeSegmentsTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = CacheFactory.create_cache("LRU", capacity=10000, num_segments=4)  # Large enough that no resize evicts
+
+    def assertKeysInPlace(self):
+        # Every stored key must sit in the segment the current layout hashes it to
+        for index, segment in enumerate(self.cache.segments):
+            for key in segment.data:
+                self.assertEqual(self.cache._get_segment(key), index, f"key {key!r} stranded in segment {index}")
+
+    def test_grow_and_shrink_keep_keys(self):
+        for i in range(200):
+            self.cache.put(f"key{i}", i)
+
+        for new_num_segments in (16, 2):
+            self.cache.resize_segments(new_num_segments)
+            self.assertEqual(self.cache.num_segments, new_num_segments)
+            self.assertEqual(self.cache.get_many([f"key{i}" for i in range(200)]), list(range(200)))
+            self.assertKeysInPlace()
+
+    def test_resize_during_concurrent_writes(self):
+        def writer(start):
+            for i in range(start, start + 2000):
+                self.cache.put(f"concurrent{i}", i)
+
+        writers = [threading.Thread(target=writer, args=(n * 2000,)) for n in range(4)]
+        for thread in writers:
+            thread.start()
+        for new_num_segments in (4, 8, 16, 2, 4, 1, 8, 32):
+            self.cache.resize_segments(new_num_segments)
+        for thread in writers:
+            thread.join()
+
+        self.assertKeysInPlace()
+        for i in range(8000):
+            self.assertEqual(self.cache.get(f"concurrent{i}"), i)
+
+class LFUEvictionPolicyTest(unittest.TestCase):
+    def test_evicts_least_frequent_then_least_recent(self):
+        policy = LFUEvictionPolicy()
+        for key in "abcd":
+            policy.add(key)
+        for key in "aabc":
+            policy.touch(key)  # Frequencies: a=3, b=2, c=2, d=1
+        self.assertEqual(policy.min_frequency, 1)
+
+        self.assertEqual(policy.evict(), "d")
+        self.assertEqual(policy.min_frequency, 2)
+        self.assertEqual(policy.evict(), "b")  # b reached frequency 2 before c
+        self.assertEqual(policy.evict(), "c")
+        self.assertEqual(policy.evict(), "a")
+        self.assertEqual(policy.min_frequency, 0)
+        with self.assertRaises(ValueError):
+            policy.evict()
+
+    def test_remove_unlinks_empty_frequency(self):
+        policy = LFUEvictionPolicy()
+        policy.add("a")
+        policy.add("b")
+        policy.touch("b")
+        policy.remove("a")
+        self.assertEqual(policy.min_frequency, 2)
+        self.assertEqual(policy.evict(), "b")
+
+class ExpiryHeapTest(unittest.TestCase):
+    def test_overwrites_keep_heap_bounded(self):
+        cache = CacheFactory.create_cache("LRU", capacity=10, num_segments=1)
+        for i in range(100000):
+            cache.put("key", i, ttl=3600)
+        self.assertLessEqual(len(cache.segments[0].expiry_heap), 2)
+        self.assertEqual(cache.get("key"), 99999)
+
+    def test_put_many_keeps_heap_bounded(self):
+        cache = CacheFactory.create_cache("LRU", capacity=10, num_segments=1)
+        for i in range(1000):
+            cache.put_many([("a", i), ("b", i)], ttl=3600)
+        self.assertLessEqual(len(cache.segments[0].expiry_heap), 4)
+        self.assertEqual(cache.get_many(["a", "b"]), [999, 999])
+
+class AdmissionFilterTest(unittest.TestCase):
+    def test_full_segment_rejects_first_offer(self):
+        cache = CacheFactory.create_cache("LRU", capacity=2, num_segments=1, admission_filter=True)
+        cache.put("a", 1)
+        cache.put("b", 2)  # Not full yet, so neither put consults the doorkeeper
+
+        cache.put("c", 3)
+        self.assertEqual(cache.get_many(["a", "b", "c"]), [1, 2, None])
+        self.assertEqual(cache.get_metrics()["rejections"], 1)
+        self.assertEqual(cache.get_metrics()["evictions"], 0)
+
+        cache.put("c", 3)  # Seen before, so it may now evict
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.get_metrics()["rejections"], 1)
+        self.assertEqual(cache.get_metrics()["evictions"], 1)
+
+    def test_disabled_by_default(self):
+        cache = CacheFactory.create_cache("LRU", capacity=2, num_segments=1)
+        for key in "abc":
+            cache.put(key, key)
+        self.assertEqual(cache.get("c"), "c")
+        self.assertEqual(cache.get_metrics()["rejections"], 0)
+
+class SerializedSegmentedCacheTest(unittest.TestCase):
+    def test_factory_flag_and_context_manager(self):
+        with CacheFactory.create_cache("LRU", capacity=10, num_segments=4, serialized=True) as cache:
+            self.assertIsInstance(cache, SerializedSegmentedCache)
+            cache.put("a", 1)
+            self.assertEqual(cache.get("a"), 1)
+            cache.remove("a")
+            with self.assertRaises(KeyError):
+                cache.get("a")
+        with self.assertRaises(RuntimeError):
+            cache.get("a")
+
+    def test_calls_fail_after_close(self):
+        cache = CacheFactory.create_cache("LRU", capacity=10, num_segments=4, serialized=True)
+        cache.put("a", 1)
+        cache.close()
+        cache.close()  # Closing twice is a no-op
+        for call in (lambda: cache.put("b", 2), lambda: cache.get("a"), lambda: cache.remove("a")):
+            with self.assertRaises(RuntimeError):
+                call()
+
+    def test_serves_keys_across_resizes(self):
+        with CacheFactory.create_cache("LRU", capacity=1000, num_segments=4, serialized=True) as cache:
+            for i in range(100):
+                cache.put(i, i)
+            for new_num_segments in (16, 2):
+                cache.resize_segments(new_num_segments)
+                self.assertEqual([cache.get(i) for i in range(100)], list(range(100)))
+
+if __name__ == "__main__":
+    unittest.main()